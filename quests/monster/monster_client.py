@@ -10,6 +10,8 @@ monster_client.py — tiny interactive client for /dev/monster (prompt_toolkit +
 import os
 import sys
 import argparse
+import codecs
+import collections
 import selectors
 import signal
 import threading
@@ -19,25 +21,31 @@ import re
 def eprint(*a, **k):
     print(*a, file=sys.stderr, **k)
 
-# Optional richer UX via prompt_toolkit
-try:
-    from prompt_toolkit import PromptSession, print_formatted_text
-    from prompt_toolkit.patch_stdout import patch_stdout
-    from prompt_toolkit.formatted_text import ANSI, HTML
-    from prompt_toolkit.completion import Completer, Completion
-    from html import escape
-    HAVE_PT = True
-except Exception:
-    HAVE_PT = False
-    PromptSession = None
-    patch_stdout = None
-    ANSI = None
-    HTML = None
-    print_formatted_text = None
-    Completer = object
-    Completion = object
-
-if HAVE_PT:
+# Optional richer UX via prompt_toolkit, imported only when an interactive session starts
+HAVE_PT = False
+PromptSession = None
+patch_stdout = None
+ANSI = None
+HTML = None
+print_formatted_text = None
+escape = None
+MonsterCompleter = None
+
+
+def _load_prompt_toolkit() -> bool:
+    """Import prompt_toolkit on first use so scripted runs never pay for it."""
+    global HAVE_PT, PromptSession, patch_stdout, ANSI, HTML, print_formatted_text, escape, MonsterCompleter
+    if HAVE_PT:
+        return True
+    try:
+        from prompt_toolkit import PromptSession, print_formatted_text
+        from prompt_toolkit.patch_stdout import patch_stdout
+        from prompt_toolkit.formatted_text import ANSI, HTML
+        from prompt_toolkit.completion import Completer, Completion
+        from html import escape
+    except Exception:
+        return False
+
     class MonsterCompleter(Completer):
         def __init__(self, client: "MonsterClient") -> None:
             self.client = client
@@ -56,67 +64,171 @@ if HAVE_PT:
                 if word.startswith(current_word):
                     yield Completion(word, start_position=-len(current_word))
 
+    HAVE_PT = True
+    return True
+
 class MonsterClient:
+    # read on every device line; slots skip the per-instance dict lookup
+    __slots__ = (
+        "dev_path", "fd", "sel", "_wsel", "prompt", "enc", "_encode", "_decode", "read_chunk",
+        "_stop", "_reader_thr", "_parser_thr", "_lines", "_wake", "_wake_r", "_wake_w",
+        "_loop", "_scheduled", "_batching", "_toolbar_dirty",
+        "_buf", "_head", "_tail", "_session", "_use_colors", "_msg_prefix", "_prefix_b",
+        "_out_encode", "_passthrough",
+        "_prefix_colored", "_out_lock", "_last_state", "_stage", "_available_commands",
+        "_toolbar_text", "_toolbar_html", "_last_tip", "_last_quest", "_stats", "_quest_goal",
+        "_theme", "_hidden_categories", "_parse_hidden", "_command_words", "_completion_cache",
+        "_handlers",
+    )
     VALID_CATEGORIES = {"state", "lifecycle", "tip", "quest", "event", "alert", "log"}
+    # initial capacity of the ring buffer; only grows if a single line outgrows it
+    BUF_SIZE = 64 * 1024
+    _WAKE_TOKEN = (1).to_bytes(8, sys.byteorder)
+    # monster_write() keeps at most sizeof(inbuf) - 1 bytes per call and drops the rest
+    DEVICE_WRITE_MAX = 255
 
     def __init__(self, dev="/dev/monster", prompt="> ", enc="utf-8", read_chunk=4096,
-                 use_colors=True, msg_prefix="[monster] ", theme="hud"):
+                 use_colors=True, msg_prefix="[monster] ", theme="hud", parse_hidden=True):
         self.dev_path = dev
         self.fd = None
         self.sel = selectors.DefaultSelector()
+        # separate selector for write readiness so send_line never touches the reader's
+        self._wsel = selectors.DefaultSelector()
         self.prompt = prompt
         self.enc = enc
+        self._encode = codecs.getencoder(enc)
+        # lines are split on raw bytes before decoding, and a UTF-8 multibyte sequence never
+        # contains b"\n", so a stateless decoder is safe across read boundaries
+        self._decode = codecs.getdecoder(enc)
         self.read_chunk = read_chunk
         self._stop = threading.Event()
         self._reader_thr = None
-        self._partial = bytearray()
+        self._parser_thr = None
+        # complete lines handed from the reader to the parser; None marks reader exit.
+        # Unbounded on purpose: a maxlen would silently drop game output when parsing lags.
+        self._lines = collections.deque()
+        self._wake = threading.Event()
+        # set by attach_loop: lines are then parsed on that asyncio loop, not the parser thread
+        self._loop = None
+        self._scheduled = False
+        self._batching = False
+        self._toolbar_dirty = False
+        # eventfd (or self-pipe) that lets stop_reader interrupt a selector blocked without a timeout
+        self._wake_r = None
+        self._wake_w = None
+        # ring buffer: pending device output runs from _head to _tail, wrapping at the end
+        self._buf = bytearray(self.BUF_SIZE)
+        self._head = 0
+        self._tail = 0
         self._session = None
         self._use_colors = use_colors
         self._msg_prefix = msg_prefix
+        # plain mode writes bytes to fd 1 itself, so it encodes for the terminal like print() did;
+        # when both sides use the same codec the device bytes pass through untouched
+        out_enc = getattr(sys.stdout, "encoding", None) or "utf-8"
+        self._out_encode = codecs.getencoder(out_enc)
+        self._passthrough = codecs.lookup(out_enc).name == codecs.lookup(enc).name
+        self._prefix_b = self._out_encode(msg_prefix, "replace")[0]
+        # dim prefix using ANSI escape; body normal
+        self._prefix_colored = f"\x1b[2m{msg_prefix}\x1b[22m" if use_colors else msg_prefix
+        self._out_lock = threading.Lock()
         self._last_state = None
         self._stage = None
         self._available_commands = []
         self._toolbar_text = "Stage: ? | Commands: look, go, state"
+        self._toolbar_html = None
         self._last_tip = None
         self._last_quest = None
         self._stats = {}
         self._quest_goal = None
         self._theme = theme
         self._hidden_categories = set()
-        self._command_words = ["look", "go", "inventory", "state", "say", "quit", "login"]
+        # False: hidden categories skip their handlers too, so toolbar/summary stop tracking them
+        self._parse_hidden = parse_hidden
+        self._command_words = {"look", "go", "inventory", "state", "say", "quit", "login"}
+        self._completion_cache = None
+        self._handlers = {
+            "state": self._handle_state_msg,
+            "lifecycle": self._handle_lifecycle_msg,
+            "tip": self._handle_tip_msg,
+            "quest": self._handle_quest_msg,
+        }
 
     # ---- device I/O -----------------------------------------------------
 
     def open(self):
-        # O_NONBLOCK lets us use selectors for smooth shutdowns
-        self.fd = os.open(self.dev_path, os.O_RDWR | os.O_NONBLOCK)
+        self.fd = os.open(self.dev_path, os.O_RDWR)
+        # non-blocking so send_line can't stall the UI; reads only follow select readiness
+        os.set_blocking(self.fd, False)
         self.sel.register(self.fd, selectors.EVENT_READ)
+        self._wsel.register(self.fd, selectors.EVENT_WRITE)
+        if hasattr(os, "eventfd"):
+            # one fd does both ends on Linux
+            self._wake_r = self._wake_w = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+        else:
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_r, False)
+            os.set_blocking(self._wake_w, False)
+        self.sel.register(self._wake_r, selectors.EVENT_READ)
 
     def close(self):
         try:
             if self.fd is not None:
                 self.sel.unregister(self.fd)
+                if self.fd in self._wsel.get_map():
+                    self._wsel.unregister(self.fd)
                 os.close(self.fd)
+            if self._wake_r is not None:
+                self.sel.unregister(self._wake_r)
+                os.close(self._wake_r)
+                if self._wake_w != self._wake_r:
+                    os.close(self._wake_w)
         finally:
             self.fd = None
+            self._wake_r = self._wake_w = None
 
     def send_line(self, line: str):
         if self.fd is None:
             raise RuntimeError("device not open")
+        self._write_all(self._encode_line(line))
+
+    def send_lines(self, lines):
+        """Send several lines, packing them into as few writes as the device input buffer takes."""
+        if self.fd is None:
+            raise RuntimeError("device not open")
+        batch = []
+        size = 0
+        for line in lines:
+            data = self._encode_line(line)
+            if batch and size + len(data) > self.DEVICE_WRITE_MAX:
+                self._write_all(b"".join(batch))
+                batch.clear()
+                size = 0
+            batch.append(data)
+            size += len(data)
+        if batch:
+            self._write_all(b"".join(batch))
+
+    def _encode_line(self, line: str) -> bytes:
+        data, _ = self._encode(line, "replace")
         if not line.endswith("\n"):
-            line = line + "\n"
-        data = line.encode(self.enc, errors="replace")
+            data += b"\n"
+        return data
+
+    def _write_all(self, data: bytes):
         # Write in a loop to handle partial writes on char devices
+        mv = memoryview(data)
+        size = len(data)
         total = 0
-        while total < len(data):
+        while total < size:
             try:
-                n = os.write(self.fd, data[total:])
+                n = os.write(self.fd, mv[total:])
                 if n <= 0:
                     raise OSError("short write")
                 total += n
             except BlockingIOError:
-                # brief backoff
-                time.sleep(0.005)
+                # wait for the device to drain rather than sleeping blind
+                self._wsel.select(timeout=0.05)
 
     # ---- printing helpers ----------------------------------------------
 
@@ -124,102 +236,138 @@ class MonsterClient:
         """Attach a prompt_toolkit session so we can print safely while prompting."""
         self._session = session
 
-    def _print_msg(self, text: str):
+    def _handle_line(self, line: bytes):
+        """
+        Run the handler for a raw device line and return what should be printed:
+        decoded text under prompt_toolkit, terminal-encoded bytes in plain mode, or None if hidden.
+        Text is decoded only when a handler, prompt_toolkit or a re-encode needs it.
         """
-        Thread-safe printing of device messages.
+        # a missing "]" slices to b"" and falls through to "log"
+        offset = line.find(b"]") + 1
+        category = self.TAG_CATEGORIES.get(line[:offset])
+        if category is None:
+            category, offset = "log", 0
+        hidden = category in self._hidden_categories
+        handler = self._handlers.get(category)
+        if hidden and (handler is None or not self._parse_hidden):
+            # nothing to print and nothing to track: skip the decode entirely
+            return None
+        if handler is None:
+            return self._printable(line)
+        text, _ = self._decode(line, "replace")
+        # tags are ASCII, so the byte offset is also the str offset
+        handler(text, offset)
+        if hidden:
+            return None
+        return self._printable(line, text)
+
+    def _printable(self, line: bytes, text=None):
+        """Text for prompt_toolkit; bytes in the terminal's encoding for plain mode."""
+        if not HAVE_PT and self._passthrough:
+            return line
+        if text is None:
+            text, _ = self._decode(line, "replace")
+        return text if HAVE_PT else self._out_encode(text, "replace")[0]
+
+    def _flush(self, pending):
+        """
+        Thread-safe printing of a batch of device messages with a single redraw/write.
         - With prompt_toolkit available, use print_formatted_text(ANSI(...)) so the prompt redraws cleanly.
-        - Otherwise, print to stdout with a simple prefix.
+        - Otherwise, write prefixed lines to stdout in a single write.
         """
-        category = self._categorise(text)
-
-        if category == "state":
-            self._last_state = text
-            self._handle_state_msg(text)
-        elif category == "lifecycle":
-            self._handle_lifecycle_msg(text)
-        elif category == "tip":
-            self._handle_tip_msg(text)
-        elif category == "quest":
-            self._last_quest = text
-            self._handle_quest_msg(text)
-
-        if category in self._hidden_categories:
-            return
         if HAVE_PT:
-            if self._use_colors:
-                # dim prefix using ANSI escape; body normal
-                colorized = f"\x1b[2m{self._msg_prefix}\x1b[22m{text}"
-            else:
-                colorized = f"{self._msg_prefix}{text}"
-            print_formatted_text(ANSI(colorized))
+            prefix = self._prefix_colored
+            print_formatted_text(ANSI(prefix + ("\n" + prefix).join(pending)))
         else:
-            print(f"{self._msg_prefix}{text}", flush=True)
-
-    def _handle_lifecycle_msg(self, text: str):
-        match = re.search(r"Stage\s+advanced\s+to\s*([A-Za-z]+)", text, re.IGNORECASE)
-        if not match:
-            match = re.search(r"current\s+stage\s*:?[\s]*([A-Za-z]+)", text, re.IGNORECASE)
-        if not match:
-            match = re.search(r"Stage\s*:?[\s]*([A-Za-z]+)", text, re.IGNORECASE)
+            prefix = self._prefix_b
+            self._write_stdout(prefix + (b"\n" + prefix).join(pending) + b"\n")
+
+    def _write_stdout(self, data: bytes):
+        """Write a batch straight to fd 1, after whatever print() still has buffered."""
+        with self._out_lock:
+            # local command output goes through sys.stdout; keep it ahead of this batch
+            sys.stdout.flush()
+            mv = memoryview(data)
+            total = 0
+            while total < len(data):
+                total += os.write(1, mv[total:])
+
+    def _handle_lifecycle_msg(self, text: str, offset: int = 0):
+        match = self.LIFECYCLE_PATTERN.search(text, offset)
         if match:
             self._stage = match.group(1)
             self._refresh_toolbar()
 
-    def _categorise(self, text: str) -> str:
-        if text.startswith("[STATE]"):
-            return "state"
-        if text.startswith("[LIFECYCLE]"):
-            return "lifecycle"
-        if text.startswith("[TIP]"):
-            return "tip"
-        if text.startswith("[QUEST]"):
-            return "quest"
-        if text.startswith("[EVENT]"):
-            return "event"
-        if text.startswith("[ALERT]"):
-            return "alert"
-        return "log"
-
-    def _handle_tip_msg(self, text: str):
+    TAG_CATEGORIES = {
+        b"[STATE]": "state",
+        b"[LIFECYCLE]": "lifecycle",
+        b"[TIP]": "tip",
+        b"[QUEST]": "quest",
+        b"[EVENT]": "event",
+        b"[ALERT]": "alert",
+    }
+
+    def _handle_tip_msg(self, text: str, offset: int = 0):
         self._last_tip = text
-        if "Commands available:" in text:
-            _, tail = text.split("Commands available:", 1)
+        marker = text.find("Commands available:", offset)
+        if marker >= 0:
+            tail = text[marker + len("Commands available:"):]
             commands = [segment.strip().strip('.') for segment in tail.split(',') if segment.strip()]
             self._available_commands = commands
-            words = {cmd.split()[0] for cmd in commands if cmd}
-            self._command_words = sorted(set(self._command_words) | words)
+            new_words = {cmd.split()[0] for cmd in commands if cmd} - self._command_words
+            if new_words:
+                self._command_words |= new_words
+                self._completion_cache = None
+            # the preview can still change when no new verbs arrive; an unchanged toolbar returns early
             self._refresh_toolbar()
 
-    STATE_PATTERN = re.compile(
-        r"stability=(?P<stability>-?\d+)\s+"
-        r"hunger=(?P<hunger>-?\d+)\s+"
-        r"mood=(?P<mood>-?\d+)\s+"
-        r"trust=(?P<trust>-?\d+)\s+"
-        r"tick=(?P<tick>\d+)\s+"
-        r"junk=(?P<junk>-?\d+)\s+"
-        r"(?:daemon_lost=(?P<daemon_lost>\w+))",
+    STATE_NUMERIC_FIELDS = frozenset(("stability", "hunger", "mood", "trust", "tick", "junk"))
+
+    LIFECYCLE_PATTERN = re.compile(
+        r"(?:Stage\s+advanced\s+to|current\s+stage\s*:?|Stage\s*:?)\s*([A-Za-z]+)",
         re.IGNORECASE,
     )
 
     QUEST_PATTERN = re.compile(
-        r"Goal:\s*reach\s+(?P<stage>[A-Za-z]+)\s*\(tick\s+(?P<tick>\d+)\+,\s*stability\s+(?P<stab>\d+)\+\)",
+        r"\s*Goal:\s*reach\s+(?P<stage>[A-Za-z]+)\s*\(tick\s+(?P<tick>\d+)\+,\s*stability\s+(?P<stab>\d+)\+\)",
         re.IGNORECASE,
     )
 
-    def _handle_state_msg(self, text: str):
-        match = self.STATE_PATTERN.search(text)
-        if match:
-            parsed = match.groupdict()
-            parsed_int = {
-                key: (int(value) if key != "daemon_lost" else value.lower() in {"yes", "true", "1"})
-                for key, value in parsed.items()
-                if value is not None
-            }
-            self._stats = parsed_int
+    def _handle_state_msg(self, text: str, offset: int = 0):
+        self._last_state = text
+        stats = self._stats
+        changed = False
+        daemon_lost = False
+        # fixed "key=value" tokens: a split beats a regex scan on this per-tick path
+        for token in text[offset:].split():
+            key, sep, value = token.partition("=")
+            if not sep:
+                # look output appends a bare "daemon-lost" only while the daemon is lost
+                daemon_lost = daemon_lost or token == "daemon-lost"
+                continue
+            if key in self.STATE_NUMERIC_FIELDS:
+                try:
+                    parsed = int(value)
+                except ValueError:
+                    continue
+            elif key == "daemon_lost":
+                daemon_lost = value.lower() in {"yes", "true", "1"}
+                continue
+            else:
+                continue
+            if key not in stats or stats[key] != parsed:
+                stats[key] = parsed
+                changed = True
+        if stats.get("daemon_lost") is not daemon_lost:
+            stats["daemon_lost"] = daemon_lost
+            changed = True
+        if changed:
             self._refresh_toolbar()
 
-    def _handle_quest_msg(self, text: str):
-        match = self.QUEST_PATTERN.search(text)
+    def _handle_quest_msg(self, text: str, offset: int = 0):
+        self._last_quest = text
+        # the goal directly follows the tag, so an anchored match suffices; skip it without "Goal:"
+        match = self.QUEST_PATTERN.match(text, offset) if "Goal:" in text else None
         if match:
             data = match.groupdict()
             self._quest_goal = {
@@ -227,7 +375,9 @@ class MonsterClient:
                 "tick": int(data["tick"]),
                 "stability": int(data["stab"]),
             }
-        elif "retired" in text.lower():
+        elif "etired" in text:
+            # matches "Retired" and "retired" without a lower() copy; checked after the goal
+            # because "Goal: reach Retired (...)" is a goal, not the retirement notice
             self._quest_goal = {
                 "stage": "Retired",
                 "tick": None,
@@ -295,10 +445,12 @@ class MonsterClient:
         return "\n".join(lines)
 
     def completion_words(self):
-        words = set(self._command_words)
-        words.update([cmd.split()[0] for cmd in self._available_commands if cmd])
-        words.update(["/help", "/filter", "/filters", "/summary"])
-        return sorted(words)
+        # called on every keystroke; rebuilt only after _handle_tip_msg drops the cache
+        if self._completion_cache is None:
+            # _handle_tip_msg already folds the available verbs into _command_words
+            words = self._command_words | {"/help", "/filter", "/filters", "/summary"}
+            self._completion_cache = tuple(sorted(words))
+        return self._completion_cache
 
     def handle_local_command(self, cmd: str) -> bool:
         parts = cmd.split()
@@ -317,6 +469,8 @@ class MonsterClient:
             print(self.summary_text())
         else:
             print("[client] unknown local command. Try /help")
+        # device batches bypass sys.stdout, so don't leave this output sitting in its buffer
+        sys.stdout.flush()
         return False
 
     def _show_help(self):
@@ -349,9 +503,12 @@ class MonsterClient:
         print(self.filters_summary())
 
     def _refresh_toolbar(self):
-        stage = self._stage or "?"
+        if self._batching:
+            # rebuilt once when the batch ends, however many lines touched it
+            self._toolbar_dirty = True
+            return
         if self._theme == "minimal":
-            self._toolbar_text = "Stage: ? | Commands: look, go, state"
+            text = "Stage: ? | Commands: look, go, state"
         else:
             stage = self._stage or "?"
             preview = self._command_preview()
@@ -362,47 +519,47 @@ class MonsterClient:
                 segments.append(f"Quest: {quest}")
             if stats:
                 segments.append(stats)
-            self._toolbar_text = " | ".join(segments)
+            text = " | ".join(segments)
+        if text == self._toolbar_text and self._toolbar_html is not None:
+            # nothing visible changed: skip the re-render and the redraw
+            return
+        self._toolbar_text = text
+        self._render_toolbar()
         if self._session and HAVE_PT:
             try:
+                # the toolbar is a static value, not a callback: swap it in and redraw
+                self._session.bottom_toolbar = self._toolbar_html
                 self._session.app.invalidate()
             except Exception:
                 pass
 
+    def _render_toolbar(self):
+        """Build the toolbar's formatted text once per change rather than on every redraw."""
+        if HAVE_PT:
+            self._toolbar_html = HTML(f"<ansigray>{escape(self._toolbar_text)}</ansigray>")
+        else:
+            self._toolbar_html = self._toolbar_text
+
     # ---- reading thread --------------------------------------------------
 
     def _drain_device(self):
-        """Read from device, print complete lines as they arrive."""
+        """Read from device and queue complete lines for the parser thread."""
         try:
             while not self._stop.is_set():
-                events = self.sel.select(timeout=0.25)
-                if not events:
-                    continue
-                for key, _ in events:
+                for key, _ in self.sel.select():
+                    if key.fd == self._wake_r:
+                        # stop_reader poked the wakeup fd
+                        return
                     try:
-                        chunk = os.read(key.fd, self.read_chunk)
-                        if not chunk:
+                        n = self._read_into_ring(key.fd)
+                        if not n:
                             # EOF from device
                             self._stop.set()
                             return
-                        self._partial.extend(chunk)
-                        # split on newlines; keep trailing partial
-                        while True:
-                            idx = self._partial.find(b"\n")
-                            if idx < 0:
-                                break
-                            line = self._partial[:idx]
-                            # strip CR if present
-                            if line.endswith(b"\r"):
-                                line = line[:-1]
-                            del self._partial[:idx+1]
-                            # print from device; avoid interfering with user typing
-                            try:
-                                decoded = line.decode(self.enc, errors="replace")
-                            except Exception:
-                                decoded = repr(line)
-                            self._print_msg(decoded)
+                        self._split_lines(n)
                     except BlockingIOError:
+                        # /dev/monster never returns EAGAIN (monster_read waits for data even
+                        # with O_NONBLOCK), but a pipe or FIFO passed as --dev can; wait again
                         continue
                     except Exception as ex:
                         eprint(f"[monster] read error: {ex}")
@@ -410,40 +567,201 @@ class MonsterClient:
                         return
         finally:
             # flush any remaining partial
-            if self._partial:
-                try:
-                    decoded = self._partial.decode(self.enc, errors="replace")
-                except Exception:
-                    decoded = repr(bytes(self._partial))
-                self._print_msg(decoded)
-                self._partial.clear()
+            if self._tail != self._head:
+                self._lines.append(self._pending())
+            self._head = self._tail = 0
+            self._lines.append(None)
+            self._notify()
+
+    def _pending(self) -> bytes:
+        """Copy out everything between head and tail, joining across the wrap."""
+        head, tail = self._head, self._tail
+        if head <= tail:
+            return bytes(self._buf[head:tail])
+        return bytes(self._buf[head:]) + bytes(self._buf[:tail])
+
+    def _read_into_ring(self, fd: int) -> int:
+        """Read up to read_chunk bytes into the contiguous free space after the tail."""
+        buf = self._buf
+        cap = len(buf)
+        if (self._tail - self._head) % cap == cap - 1:
+            # full (one slot stays free to tell full from empty): a line outgrew the ring
+            pending = self._pending()
+            buf = self._buf = bytearray(cap * 2)
+            buf[:len(pending)] = pending
+            self._head, self._tail = 0, len(pending)
+            cap = len(buf)
+        head, tail = self._head, self._tail
+        if tail >= head:
+            end = cap if head else cap - 1
+        else:
+            end = head - 1
+        end = min(end, tail + self.read_chunk)
+        # a single iovec on purpose: the device has no read_iter, so readv would call
+        # monster_read once per iovec, and that blocks on an empty fifo even with O_NONBLOCK.
+        # Any bytes past the end of the ring are read after the next readiness event.
+        with memoryview(buf) as mv:
+            n = os.readv(fd, [mv[tail:end]])
+        self._tail = (tail + n) % cap
+        return n
+
+    def _split_lines(self, new: int):
+        """Queue every complete line in the ring; keep the trailing partial."""
+        buf = self._buf
+        cap = len(buf)
+        # only the `new` bytes just read can hold a newline: older pending bytes never do
+        head, tail = self._head, self._tail
+        # _read_into_ring fills one segment per call, so the new bytes never wrap
+        start = (tail - new) % cap
+        last = buf.rfind(b"\n", start, start + new)
+        if last < 0:
+            return
+        with memoryview(buf) as mv:
+            if head <= last:
+                complete = bytes(mv[head:last])
+            else:
+                # the complete lines wrap around the end of the ring
+                complete = bytes(mv[head:]) + bytes(mv[:last])
+        # one split in C instead of a find/slice per line
+        lines = complete.split(b"\n")
+        if b"\r" in complete:
+            # strip CR if present
+            lines = [line[:-1] if line.endswith(b"\r") else line for line in lines]
+        self._lines.extend(lines)
+        self._head = (last + 1) % cap
+        if self._head == self._tail:
+            self._head = self._tail = 0
+        self._notify()
+
+    def _notify(self):
+        """Tell the consumer that lines are queued: the parser thread, or the attached event loop."""
+        loop = self._loop
+        if loop is None:
+            self._wake.set()
+            return
+        if self._scheduled:
+            # a batch is already pending on the loop and will pick these lines up
+            return
+        self._scheduled = True
+        try:
+            loop.call_soon_threadsafe(self._run_batch_on_loop)
+        except RuntimeError:
+            # loop closed between attach_loop(None) and now; lines stay queued
+            self._scheduled = False
+
+    def _run_batch_on_loop(self):
+        # clear first: lines queued while this batch runs schedule the next one
+        self._scheduled = False
+        if self._loop is None:
+            # detached before this ran; the parser thread owns the queue now
+            return
+        if not self._process_batch():
+            # keep the reader's exit marker queued: a parser thread started on detach
+            # must see it too, or it would wait on _wake forever
+            self._lines.appendleft(None)
+
+    def _process_batch(self) -> bool:
+        """Handle every queued line, print the visible ones at once; False once the reader is done."""
+        lines = self._lines
+        pending = []
+        done = False
+        self._batching = True
+        try:
+            while lines:
+                line = lines.popleft()
+                if line is None:
+                    done = True
+                    break
+                printable = self._handle_line(line)
+                if printable is not None:
+                    pending.append(printable)
+        finally:
+            self._batching = False
+        if pending:
+            # print from device; avoid interfering with user typing
+            self._flush(pending)
+        if self._toolbar_dirty:
+            self._toolbar_dirty = False
+            self._refresh_toolbar()
+        return not done
+
+    def _parse_lines(self):
+        """Parse queued lines batch by batch until the reader signals exit."""
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if not self._process_batch():
+                return
+
+    def attach_loop(self, loop):
+        """
+        Parse on `loop` (prompt_toolkit's asyncio loop) instead of the parser thread, so
+        device lines are handled on the UI thread; pass None to detach.
+        Detaching hands the queue back to a parser thread, so lines still queued or yet to
+        arrive (the final "Goodbye.", state for --status) are not left unparsed.
+        """
+        self._loop = loop
+        if loop is not None:
+            self._notify()
+            return
+        if self._reader_thr is not None and self._parser_thr is None:
+            self._parser_thr = threading.Thread(target=self._parse_lines, daemon=True)
+            self._parser_thr.start()
+            self._wake.set()
 
-    def start_reader(self):
+    def start_reader(self, parse_in_thread=True):
         self._reader_thr = threading.Thread(target=self._drain_device, daemon=True)
+        if parse_in_thread:
+            self._parser_thr = threading.Thread(target=self._parse_lines, daemon=True)
+            self._parser_thr.start()
         self._reader_thr.start()
 
     def stop_reader(self):
         self._stop.set()
+        if self._wake_w is not None:
+            try:
+                # an 8-byte counter increment for eventfd; any payload works for the pipe
+                os.write(self._wake_w, self._WAKE_TOKEN)
+            except BlockingIOError:
+                # already full of wakeups
+                pass
         if self._reader_thr:
             self._reader_thr.join(timeout=1.0)
+        if self._parser_thr:
+            self._parser_thr.join(timeout=1.0)
 
 # ---- CLI ---------------------------------------------------------------
 
+# ASCII unit separator: can't appear in a typed command, so --cmds needs no quoting
+CMDS_SEPARATOR = "\x1f"
+
+
 def main():
     ap = argparse.ArgumentParser(description="Interactive client for /dev/monster")
     ap.add_argument("-d", "--dev", default="/dev/monster", help="device path (default: /dev/monster)")
     ap.add_argument("--name", help="auto-login: send `login <name>` on connect")
     ap.add_argument("-c", "--cmd", action="append", default=[], help="command to send (can be repeated)")
+    ap.add_argument("--cmds", action="append", default=[],
+                    help="several commands in one argument, separated by \\x1f (sent after --cmd)")
     ap.add_argument("--no-interactive", action="store_true", help="do not drop into interactive shell after --cmd")
     ap.add_argument("--encoding", default="utf-8", help="text encoding (default: utf-8)")
+    ap.add_argument("--plain", action="store_true",
+                    help="use the plain stdin loop even if prompt_toolkit is installed (for scripted stdin)")
     ap.add_argument("--no-echo-prompt", action="store_true", help="do not print local prompt (plain mode only)")
     ap.add_argument("--no-color", action="store_true", help="disable colored device messages")
     ap.add_argument("--status", action="store_true", help="print the latest [STATE] block on shutdown")
     ap.add_argument("--theme", choices=["hud", "minimal"], default="hud", help="UI theme (hud|minimal)")
+    ap.add_argument("--no-parse-hidden", action="store_true",
+                    help="skip parsing categories hidden with /filter (toolbar and /summary stop tracking them)")
     args = ap.parse_args()
 
+    # load prompt_toolkit before the reader starts so every line takes the same output path
+    if not args.no_interactive and not args.plain:
+        _load_prompt_toolkit()
+
     use_colors = not args.no_color and args.theme != "minimal"
-    client = MonsterClient(dev=args.dev, enc=args.encoding, use_colors=use_colors, theme=args.theme)
+    client = MonsterClient(dev=args.dev, enc=args.encoding, use_colors=use_colors, theme=args.theme,
+                           parse_hidden=not args.no_parse_hidden)
 
     # Clean shutdown on Ctrl+C
     def handle_sigint(sig, frame):
@@ -460,16 +778,18 @@ def main():
         eprint(f"[monster] failed to open {args.dev}: {ex}")
         return 2
 
-    client.start_reader()
+    # interactive prompt_toolkit sessions parse on the prompt's event loop instead
+    client.start_reader(parse_in_thread=args.no_interactive or not HAVE_PT)
 
     # Optional auto-login and scripted commands
     try:
-        if args.name:
-            client.send_line(f"login {args.name}")
-        for c in args.cmd:
-            client.send_line(c)
-            # tiny delay so server can interleave responses nicely
-            time.sleep(0.05)
+        startup = [f"login {args.name}"] if args.name else []
+        startup += args.cmd
+        for packed in args.cmds:
+            startup += [cmd for cmd in packed.split(CMDS_SEPARATOR) if cmd]
+        # the device handles lines in order, so no pacing is needed between them
+        if startup:
+            client.send_lines(startup)
     except Exception as ex:
         eprint(f"[monster] write error while sending startup commands: {ex}")
 
@@ -482,25 +802,27 @@ def main():
 
     # Interactive loop
     if HAVE_PT:
+        # only the prompt_toolkit session runs an event loop; scripted runs skip the import
+        import asyncio
+
         # Persistent commands reminder in the bottom toolbar
         help_text = "Stage: ? | Commands: look, go, state"
         client._toolbar_text = help_text
-
-        def toolbar_provider():
-            return HTML(f'<ansigray>{escape(client._toolbar_text)}</ansigray>') if HTML else client._toolbar_text
+        client._render_toolbar()
 
         completer = MonsterCompleter(client) if HAVE_PT else None
         session = PromptSession(
             "> ",
-            bottom_toolbar=toolbar_provider,
+            bottom_toolbar=client._toolbar_html,
             completer=completer,
         )
         client.set_session(session)
-        try:
-            # patch_stdout ensures background prints don't break the prompt line
-            with patch_stdout():
+
+        async def interact():
+            client.attach_loop(asyncio.get_running_loop())
+            try:
                 while True:
-                    line = session.prompt()
+                    line = await session.prompt_async()
                     if not line:
                         continue
                     cmd = line.strip()
@@ -515,6 +837,13 @@ def main():
                             pass
                         break
                     client.send_line(line)
+            finally:
+                client.attach_loop(None)
+
+        try:
+            # patch_stdout ensures background prints don't break the prompt line
+            with patch_stdout():
+                asyncio.run(interact())
         except (EOFError, KeyboardInterrupt):
             pass
     else:
@@ -1,4 +1,10 @@
+import asyncio
+import contextlib
 import importlib.util
+import io
+import os
+import selectors
+import time
 from pathlib import Path
 from unittest import mock
 
@@ -11,6 +17,37 @@ monster_client = importlib.util.module_from_spec(SPEC)
 SPEC.loader.exec_module(monster_client)
 
 
+@pytest.fixture
+def prompt_toolkit_loaded(monkeypatch):
+    """Load prompt_toolkit into the client module, restoring the lazy globals afterwards."""
+    for name in ("HAVE_PT", "PromptSession", "patch_stdout", "ANSI", "HTML",
+                 "print_formatted_text", "escape", "MonsterCompleter"):
+        monkeypatch.setattr(monster_client, name, getattr(monster_client, name))
+    if not monster_client._load_prompt_toolkit():
+        pytest.skip("prompt_toolkit not installed")
+
+
+@contextlib.contextmanager
+def _device_pipe(client, data):
+    """Point `client` at a pipe holding `data` followed by EOF, closing it afterwards."""
+    rfd, wfd = os.pipe()
+    client.fd = rfd
+    client.sel.register(rfd, selectors.EVENT_READ)
+    try:
+        os.write(wfd, data)
+        os.close(wfd)
+        yield
+    finally:
+        client.close()
+
+
+def _drain_bytes(client, data):
+    """Run the reader and parser over `data` as if the device sent it and then hung up."""
+    with _device_pipe(client, data):
+        client._drain_device()
+        client._parse_lines()
+
+
 def test_send_line_writes_all_bytes_with_newline(monkeypatch):
     client = monster_client.MonsterClient()
     client.fd = 5
@@ -32,27 +69,247 @@ def test_send_line_writes_all_bytes_with_newline(monkeypatch):
     assert b"".join(chunks) == b"ping\n"
 
 
+def test_send_line_waits_for_writable_on_eagain(monkeypatch):
+    client = monster_client.MonsterClient()
+    client.fd = 5
+    written = []
+    waits = []
+
+    def fake_write(fd, data):
+        if not waits:
+            raise BlockingIOError()
+        written.append(bytes(data))
+        return len(data)
+
+    monkeypatch.setattr(monster_client.os, "write", fake_write)
+    monkeypatch.setattr(client._wsel, "select", lambda timeout=None: waits.append(timeout) or [])
+
+    client.send_line("look")
+
+    assert written == [b"look\n"]
+    assert waits == [0.05]
+
+
+def test_send_lines_packs_commands_within_device_buffer(monkeypatch):
+    client = monster_client.MonsterClient()
+    client.fd = 5
+    writes = []
+
+    def fake_write(fd, data):
+        writes.append(bytes(data))
+        return len(data)
+
+    monkeypatch.setattr(monster_client.os, "write", fake_write)
+    long_say = "say " + "a" * 240
+
+    client.send_lines(["login Ada", "look", long_say, "state\n"])
+
+    assert writes == [b"login Ada\nlook\n", (long_say + "\nstate\n").encode()]
+    assert all(len(chunk) <= client.DEVICE_WRITE_MAX for chunk in writes)
+
+
+def test_client_instances_have_no_attribute_dict():
+    client = monster_client.MonsterClient()
+
+    assert not hasattr(client, "__dict__")
+    with pytest.raises(AttributeError):
+        client.typo_attribute = 1
+
+
 def test_send_line_requires_open_fd():
     client = monster_client.MonsterClient()
     with pytest.raises(RuntimeError):
         client.send_line("hello")
 
 
-def test_print_msg_plain_mode_updates_last_state(monkeypatch):
+def test_drain_device_splits_burst_into_lines(monkeypatch):
+    client = monster_client.MonsterClient(read_chunk=8)
+    client._buf = bytearray(16)
+    received = []
+    monkeypatch.setattr(monster_client.MonsterClient, "_handle_line",
+                        lambda self, line: received.append(line.decode()))
+
+    _drain_bytes(client, b"one\r\ntwo\n" + b"x" * 40 + b"\nthree\npartial")
+
+    assert received == ["one", "two", "x" * 40, "three", "partial"]
+
+
+def test_drain_device_retries_eagain_from_pipe_backed_dev(monkeypatch):
+    client = monster_client.MonsterClient()
+    received = []
+    monkeypatch.setattr(monster_client.MonsterClient, "_handle_line",
+                        lambda self, line: received.append(line))
+    real_readv = os.readv
+    attempts = []
+
+    def flaky_readv(fd, views):
+        attempts.append(fd)
+        if len(attempts) == 1:
+            raise BlockingIOError()
+        return real_readv(fd, views)
+
+    monkeypatch.setattr(monster_client.os, "readv", flaky_readv)
+
+    _drain_bytes(client, b"still here\n")
+
+    assert len(attempts) >= 2
+    assert received == [b"still here"]
+
+
+def test_drain_device_joins_lines_across_ring_wrap(monkeypatch):
+    client = monster_client.MonsterClient(read_chunk=5)
+    client._buf = bytearray(16)
+    received = []
+    monkeypatch.setattr(monster_client.MonsterClient, "_handle_line",
+                        lambda self, line: received.append(line.decode()))
+    expected = [f"line{i}" for i in range(40)]
+
+    _drain_bytes(client, "".join(f"{line}\n" for line in expected).encode())
+
+    assert received == expected
+    assert len(client._buf) == 16
+
+
+def test_read_into_ring_issues_one_read_per_readiness(monkeypatch):
+    client = monster_client.MonsterClient(read_chunk=64)
+    client._buf = bytearray(16)
+    client._head, client._tail = 10, 12
+    client._buf[10:12] = b"ab"
+    stream = bytearray(b"cdef\nghij")
+    calls = []
+
+    def fake_readv(fd, views):
+        # monster_read blocks once its fifo is empty, so a second iovec would hang
+        assert len(views) == 1, "second iovec would block in monster_read"
+        calls.append(len(views[0]))
+        n = min(len(views[0]), len(stream))
+        views[0][:n] = stream[:n]
+        del stream[:n]
+        return n
+
+    monkeypatch.setattr(monster_client.os, "readv", fake_readv)
+
+    # only up to the end of the ring, even though there's room after the wrap
+    assert client._read_into_ring(5) == 4
+    assert client._tail == 0
+    client._split_lines(4)
+    # the wrap is picked up by the next read
+    assert client._read_into_ring(5) == 5
+    client._split_lines(5)
+
+    assert calls == [4, 9]
+    assert list(client._lines) == [b"abcdef"]
+    assert client._pending() == b"ghij"
+
+
+def test_parser_backlog_keeps_every_line(monkeypatch):
+    client = monster_client.MonsterClient()
+    received = []
+    monkeypatch.setattr(monster_client.MonsterClient, "_handle_line", lambda self, line: received.append(line))
+
+    client._lines.extend(f"line{i}".encode() for i in range(5000))
+    client._lines.append(None)
+    client._wake.set()
+    client._parse_lines()
+
+    assert len(received) == 5000
+    assert received[0] == b"line0"
+
+
+def test_stop_reader_wakes_idle_reader_immediately(tmp_path):
+    fifo = tmp_path / "monster"
+    os.mkfifo(fifo)
+    client = monster_client.MonsterClient(dev=str(fifo))
+    client.open()
+    try:
+        client.start_reader()
+        started = time.monotonic()
+        client.stop_reader()
+        elapsed = time.monotonic() - started
+    finally:
+        client.close()
+
+    assert not client._reader_thr.is_alive()
+    assert not client._parser_thr.is_alive()
+    assert elapsed < 0.2
+
+
+def test_multibyte_character_split_across_reads_decodes_cleanly(monkeypatch):
+    client = monster_client.MonsterClient(read_chunk=3)
+    received = []
+    monkeypatch.setattr(monster_client, "HAVE_PT", True)
+    monkeypatch.setattr(monster_client.MonsterClient, "_flush", lambda self, pending: received.extend(pending))
+
+    _drain_bytes(client, "[EVENT] Glitch storm … ✨\n".encode())
+
+    assert received == ["[EVENT] Glitch storm … ✨"]
+
+
+def test_plain_mode_batch_updates_last_state_and_prints(monkeypatch):
+    monkeypatch.setattr(monster_client.sys, "stdout", mock.Mock(encoding="utf-8"))
     client = monster_client.MonsterClient(msg_prefix="[test] ")
-    client._last_state = None
     messages = []
 
+    def fake_write(fd, data):
+        messages.append((fd, bytes(data)))
+        return len(data)
+
     monkeypatch.setattr(monster_client, "HAVE_PT", False)
-    monkeypatch.setattr(monster_client, "print", lambda msg, flush=True: messages.append(msg), raising=False)
+    monkeypatch.setattr(monster_client.os, "write", fake_write)
 
-    client._print_msg("[STATE] stability=78 hunger=2 mood=4 trust=5 tick=123 junk=3 daemon_lost=no")
+    client._lines.extend([b"[STATE] stability=78 hunger=2 mood=4 trust=5 tick=123 junk=3 daemon_lost=no", None])
+    client._wake.set()
+    client._parse_lines()
 
     assert client._last_state == "[STATE] stability=78 hunger=2 mood=4 trust=5 tick=123 junk=3 daemon_lost=no"
     assert client._stats["stability"] == 78
     assert client._stats["hunger"] == 2
     assert client._stats["daemon_lost"] is False
-    assert messages == ["[test] [STATE] stability=78 hunger=2 mood=4 trust=5 tick=123 junk=3 daemon_lost=no"]
+    assert messages == [(1, b"[test] [STATE] stability=78 hunger=2 mood=4 trust=5 tick=123 junk=3 daemon_lost=no\n")]
+
+
+def test_plain_mode_reencodes_when_device_and_terminal_encodings_differ(monkeypatch):
+    monkeypatch.setattr(monster_client, "HAVE_PT", False)
+    monkeypatch.setattr(monster_client.sys, "stdout", mock.Mock(encoding="utf-8"))
+
+    latin = monster_client.MonsterClient(enc="latin-1")
+    assert latin._handle_line(b"[EVENT] caf\xe9") == "[EVENT] café".encode("utf-8")
+    assert latin._handle_line(b"caf\xe9 chatter") == "café chatter".encode("utf-8")
+
+    same = monster_client.MonsterClient(enc="UTF8")
+    line = "[EVENT] café".encode("utf-8")
+    assert same._handle_line(line) is line
+
+
+def test_state_message_from_look_updates_stats_in_place(monkeypatch):
+    client = monster_client.MonsterClient()
+    stats = client._stats
+    monkeypatch.setattr(monster_client, "HAVE_PT", False)
+
+    client._handle_state_msg("[STATE] stability=61 hunger=3 mood=-2 trust=7 tick=40 junk=1 daemon-lost")
+
+    assert client._stats is stats
+    assert stats == {"stability": 61, "hunger": 3, "mood": -2, "trust": 7, "tick": 40, "junk": 1,
+                     "daemon_lost": True}
+    assert "Stab 61" in client._toolbar_text
+
+
+def test_state_message_tracks_daemon_lost_in_both_formats(monkeypatch):
+    client = monster_client.MonsterClient()
+    monkeypatch.setattr(monster_client, "HAVE_PT", False)
+
+    client._handle_state_msg("[STATE] stability=61 hunger=3 mood=0 trust=7 tick=40 junk=1 daemon-lost")
+    assert client._stats["daemon_lost"] is True
+
+    # look output drops the bare token once the daemon is rescued
+    client._handle_state_msg("[STATE] stability=61 hunger=3 mood=0 trust=7 tick=41 junk=1")
+    assert client._stats["daemon_lost"] is False
+    assert "Daemon lost: False" in client.summary_text()
+
+    client._handle_state_msg("[STATE] stability=61 hunger=3 mood=0 trust=7 tick=42 junk=1 daemon_lost=yes")
+    assert client._stats["daemon_lost"] is True
+    client._handle_state_msg("[STATE] stability=61 hunger=3 mood=0 trust=7 tick=43 junk=1 daemon_lost=no")
+    assert client._stats["daemon_lost"] is False
 
 
 def test_main_runs_startup_commands_and_skips_interactive(monkeypatch):
@@ -75,8 +332,9 @@ def test_main_runs_startup_commands_and_skips_interactive(monkeypatch):
         def close(self):
             self.closed = True
 
-        def start_reader(self):
+        def start_reader(self, parse_in_thread=True):
             self.reader_started = True
+            self.parse_in_thread = parse_in_thread
 
         def stop_reader(self):
             self.stopped = True
@@ -84,6 +342,9 @@ def test_main_runs_startup_commands_and_skips_interactive(monkeypatch):
         def send_line(self, line):
             self.sent.append(line)
 
+        def send_lines(self, lines):
+            self.sent.extend(lines)
+
     argv = [
         "monster_client.py",
         "--dev",
@@ -94,6 +355,8 @@ def test_main_runs_startup_commands_and_skips_interactive(monkeypatch):
         "look",
         "--cmd",
         "feed",
+        "--cmds",
+        "state\x1f\x1fsay hi",
         "--no-interactive",
     ]
 
@@ -102,30 +365,132 @@ def test_main_runs_startup_commands_and_skips_interactive(monkeypatch):
     monkeypatch.setattr(monster_client.time, "sleep", lambda *_, **__: None)
     monkeypatch.setattr(monster_client, "HAVE_PT", False)
     monkeypatch.setattr(monster_client.sys, "argv", argv)
+    loader = mock.Mock(return_value=False)
+    monkeypatch.setattr(monster_client, "_load_prompt_toolkit", loader)
 
     exit_code = monster_client.main()
 
     client = created["client"]
     assert client.open_called
     assert client.reader_started
-    assert client.sent == ["login Ada", "look", "feed"]
+    assert client.parse_in_thread
+    assert client.sent == ["login Ada", "look", "feed", "state", "say hi"]
     assert client.stopped
     assert client.closed
     assert exit_code == 0
+    loader.assert_not_called()
+
+
+def test_main_plain_flag_skips_prompt_toolkit_and_exits_on_stdin_eof(monkeypatch):
+    client = mock.Mock()
+    argv = ["monster_client.py", "--dev", "/tmp/monster", "--plain", "--no-echo-prompt"]
+
+    monkeypatch.setattr(monster_client, "MonsterClient", mock.Mock(return_value=client))
+    monkeypatch.setattr(monster_client.signal, "signal", lambda *_, **__: None)
+    monkeypatch.setattr(monster_client, "HAVE_PT", False)
+    monkeypatch.setattr(monster_client.sys, "argv", argv)
+    monkeypatch.setattr(monster_client.sys, "stdin", io.StringIO(""))
+    loader = mock.Mock(return_value=True)
+    monkeypatch.setattr(monster_client, "_load_prompt_toolkit", loader)
+
+    exit_code = monster_client.main()
+
+    assert exit_code == 0
+    loader.assert_not_called()
+    client.start_reader.assert_called_once_with(parse_in_thread=True)
+    client.send_line.assert_not_called()
+    client.stop_reader.assert_called_once_with()
+    client.close.assert_called_once_with()
+
+
+def test_parse_lines_plain_mode_coalesces_batch_into_one_write(monkeypatch):
+    client = monster_client.MonsterClient(msg_prefix="[test] ")
+    written = []
+    monkeypatch.setattr(monster_client, "HAVE_PT", False)
+    monkeypatch.setattr(monster_client.os, "write", lambda fd, data: written.append(bytes(data)) or len(data))
+    client.toggle_filter("log", True)
+
+    client._lines.extend([
+        b"[EVENT] Lucky sync!",
+        b"hidden chatter",
+        b"[TIP] Commands available: look, feed <slot>.",
+        None,
+    ])
+    client._wake.set()
+    client._parse_lines()
+
+    assert written == [b"[test] [EVENT] Lucky sync!\n[test] [TIP] Commands available: look, feed <slot>.\n"]
+    assert client._available_commands == ["look", "feed <slot>"]
+
+
+def test_write_stdout_flushes_print_buffer_and_retries_short_writes(monkeypatch):
+    client = monster_client.MonsterClient()
+    events = []
+
+    def fake_write(fd, data):
+        n = min(len(data), 4)
+        events.append(("write", fd, bytes(data[:n])))
+        return n
+
+    stdout = mock.Mock()
+    stdout.flush.side_effect = lambda: events.append(("flush",))
+    monkeypatch.setattr(monster_client.sys, "stdout", stdout)
+    monkeypatch.setattr(monster_client.os, "write", fake_write)
+
+    client._write_stdout(b"[monster] hi\n")
+
+    assert events[0] == ("flush",)
+    assert b"".join(event[2] for event in events[1:]) == b"[monster] hi\n"
+
+
+def test_hidden_categories_are_parsed_unless_disabled(monkeypatch):
+    monkeypatch.setattr(monster_client, "HAVE_PT", False)
+    monkeypatch.setattr(monster_client.os, "write", mock.Mock(side_effect=lambda fd, data: len(data)))
+    line = b"[STATE] stability=9 hunger=1 mood=0 trust=0 tick=3 junk=0 daemon_lost=no"
+
+    tracking = monster_client.MonsterClient()
+    tracking.toggle_filter("state", True)
+    assert tracking._handle_line(line) is None
+    assert tracking._stats["stability"] == 9
+
+    dropping = monster_client.MonsterClient(parse_hidden=False)
+    dropping.toggle_filter("state", True)
+    dropping.toggle_filter("event", True)
+    assert dropping._handle_line(line) is None
+    assert dropping._handle_line(b"[EVENT] Lucky sync!") is None
+    assert dropping._stats == {}
+    assert dropping._last_state is None
+    monster_client.os.write.assert_not_called()
+
+
+def test_handle_line_matches_leading_tag_only(monkeypatch):
+    monkeypatch.setattr(monster_client, "HAVE_PT", False)
+    client = monster_client.MonsterClient()
+    client.toggle_filter("log", True)
+
+    assert client._handle_line(b"[ALERT] A baby daemon wanders in!") is not None
+    assert client._handle_line(b"[HELPERS] IOPixie") is None
+    assert client._handle_line(b"Objects here: [TIP]") is None
+    assert client._handle_line(b"no tag at all") is None
+    assert client._last_tip is None
+
+    client._handle_line(b"[TIP] Commands available: look.")
+    assert client._last_tip == "[TIP] Commands available: look."
 
 
 def test_lifecycle_message_updates_stage(monkeypatch):
     client = monster_client.MonsterClient(msg_prefix="[test] ")
-    messages = []
     monkeypatch.setattr(monster_client, "HAVE_PT", False)
-    monkeypatch.setattr(monster_client, "print", lambda msg, flush=True: messages.append(msg), raising=False)
 
-    client._print_msg("[LIFECYCLE] Stage advanced to Growing!")
+    client._handle_line(b"[LIFECYCLE] Stage advanced to Growing!")
     assert client._stage == "Growing"
 
-    client._print_msg("[LIFECYCLE] Current stage: Hatchling.")
+    client._handle_line(b"[LIFECYCLE] Current stage: Hatchling.")
     assert client._stage == "Hatchling"
 
+    client._handle_line(b"[LIFECYCLE] Stage Mature.")
+    assert client._stage == "Mature"
+
 
 def test_tip_commands_available_updates_toolbar(monkeypatch):
     client = monster_client.MonsterClient(msg_prefix="[test] ")
@@ -138,13 +503,133 @@ def test_tip_commands_available_updates_toolbar(monkeypatch):
     assert "feed <slot>" in client._toolbar_text
 
 
+def test_completion_words_cached_until_tip_changes_commands(monkeypatch):
+    client = monster_client.MonsterClient()
+    monkeypatch.setattr(monster_client, "HAVE_PT", False)
+
+    words = client.completion_words()
+    assert client.completion_words() is words
+    assert "feed" not in words
+
+    client._handle_tip_msg("[TIP] Commands available: look, feed <slot>.")
+
+    words = client.completion_words()
+    assert "feed" in words
+
+    client._handle_tip_msg("[TIP] Commands available: look, feed <slot>, state.")
+
+    assert client.completion_words() is words
+    assert "state" in client._toolbar_text
+
+
+def test_refresh_toolbar_swaps_static_session_toolbar(prompt_toolkit_loaded):
+    client = monster_client.MonsterClient()
+    session = mock.Mock()
+    client.set_session(session)
+
+    client._handle_tip_msg("[TIP] Commands available: look, go, state, grab <item>.")
+
+    assert session.bottom_toolbar is client._toolbar_html
+    session.app.invalidate.assert_called_once_with()
+
+    client._handle_tip_msg("[TIP] Commands available: look, go, state, grab <item>.")
+    client._handle_state_msg("[STATE] stability=5 hunger=1 mood=0 trust=0 tick=7 junk=0 daemon_lost=no")
+    client._handle_state_msg("[STATE] stability=5 hunger=1 mood=0 trust=0 tick=7 junk=0 daemon_lost=no")
+
+    assert session.app.invalidate.call_count == 2
+
+
+def test_attached_loop_parses_queue_in_one_batch(prompt_toolkit_loaded, monkeypatch):
+    client = monster_client.MonsterClient()
+    session = mock.Mock()
+    client.set_session(session)
+    batches = []
+    monkeypatch.setattr(monster_client.MonsterClient, "_flush", lambda self, pending: batches.append(list(pending)))
+
+    loop = asyncio.new_event_loop()
+    try:
+        client.attach_loop(loop)
+        client._lines.extend([
+            b"[STATE] stability=5 hunger=1 mood=0 trust=0 tick=7 junk=0 daemon_lost=no",
+            b"[STATE] stability=6 hunger=1 mood=0 trust=0 tick=8 junk=0 daemon_lost=no",
+            b"[TIP] Commands available: look, feed <slot>.",
+        ])
+        client._notify()
+        client._notify()
+        loop.run_until_complete(asyncio.sleep(0))
+    finally:
+        client.attach_loop(None)
+        loop.close()
+
+    assert len(batches) == 1 and len(batches[0]) == 3
+    assert client._stats["stability"] == 6
+    session.app.invalidate.assert_called_once_with()
+    assert "Stab 6" in client._toolbar_text and "feed <slot>" in client._toolbar_text
+
+
+def test_detaching_loop_hands_queued_lines_to_parser_thread(monkeypatch):
+    client = monster_client.MonsterClient()
+    received = []
+    monkeypatch.setattr(monster_client.MonsterClient, "_handle_line",
+                        lambda self, line: received.append(line))
+
+    loop = asyncio.new_event_loop()
+    data = b"[STATE] stability=5 hunger=0 mood=0 trust=0 tick=1 junk=0 daemon_lost=no\nGoodbye.\n"
+    try:
+        client.attach_loop(loop)
+        with _device_pipe(client, data):
+            client.start_reader(parse_in_thread=False)
+            client._reader_thr.join(timeout=1.0)
+            # the loop never got to run its scheduled batch
+            client.attach_loop(None)
+            client._parser_thr.join(timeout=1.0)
+            loop.run_until_complete(asyncio.sleep(0))
+    finally:
+        loop.close()
+
+    assert not client._parser_thr.is_alive()
+    assert received == [
+        b"[STATE] stability=5 hunger=0 mood=0 trust=0 tick=1 junk=0 daemon_lost=no",
+        b"Goodbye.",
+    ]
+
+
+def test_detaching_after_loop_saw_reader_exit_stops_promptly(monkeypatch):
+    client = monster_client.MonsterClient()
+    received = []
+    monkeypatch.setattr(monster_client.MonsterClient, "_handle_line",
+                        lambda self, line: received.append(line))
+
+    loop = asyncio.new_event_loop()
+    try:
+        client.attach_loop(loop)
+        with _device_pipe(client, b"Goodbye.\n"):
+            client.start_reader(parse_in_thread=False)
+            client._reader_thr.join(timeout=1.0)
+            # the loop batch handles the line and the reader's exit marker
+            loop.run_until_complete(asyncio.sleep(0))
+            client.attach_loop(None)
+            started = time.monotonic()
+            client.stop_reader()
+            elapsed = time.monotonic() - started
+    finally:
+        loop.close()
+
+    assert received == [b"Goodbye."]
+    assert not client._parser_thr.is_alive()
+    assert elapsed < 0.2
+
+
 def test_quest_message_tracks_last(monkeypatch):
     client = monster_client.MonsterClient(msg_prefix="[test] ")
     monkeypatch.setattr(monster_client, "HAVE_PT", False)
-    client._print_msg("[QUEST] Goal: reach Growing (tick 120+, stability 40+).")
+    client._handle_line(b"[QUEST] Goal: reach Growing (tick 120+, stability 40+).")
 
     assert client._last_quest == "[QUEST] Goal: reach Growing (tick 120+, stability 40+)."
     assert client._quest_goal == {"stage": "Growing", "tick": 120, "stability": 40}
 
-    client._print_msg("[QUEST] The Friendly Monster is retired. Enjoy free play!")
+    client._handle_line(b"[QUEST] Goal: reach Retired (tick 720+, stability 75+).")
+    assert client._quest_goal == {"stage": "Retired", "tick": 720, "stability": 75}
+
+    client._handle_line(b"[QUEST] The Friendly Monster is retired. Enjoy free play!")
     assert client._quest_goal == {"stage": "Retired", "tick": None, "stability": None}
@@ -1,57 +1,147 @@
+import os
+import select
 import subprocess
 import sys
+import tempfile
+import time
+import warnings
 from pathlib import Path
 
 import pytest
 
 
-def _resolve_paths():
-    dev_path = Path("/dev/monster")
-    client_path = Path(__file__).resolve().parents[1] / "monster_client.py"
-    if not client_path.exists():
-        pytest.skip("monster_client.py not found")
-    if not dev_path.exists():
-        pytest.skip("/dev/monster not present; load the module first")
-    return dev_path, client_path
+# The module answers any command it doesn't know with "Unknown command.", so sending one
+# after a batch marks where that batch's output ends.
+FRAME_COMMAND = "frame-end"
+FRAME_REPLY = b"Unknown command."
 
+# replies arrive within milliseconds; raise this on slow or heavily loaded machines
+TIMEOUT = float(os.environ.get("MONSTER_TEST_TIMEOUT", "1.0"))
 
-def run_client(*commands, timeout=5):
-    dev_path, client_path = _resolve_paths()
-    args = [
-        sys.executable,
-        str(client_path),
-        "--dev",
-        str(dev_path),
-        "--no-interactive",
-    ]
-    for cmd in commands:
-        args.extend(["--cmd", cmd])
-
-    try:
-        completed = subprocess.run(
+DEV_PATH = Path("/dev/monster")
+CLIENT_PATH = Path(__file__).resolve().parents[1] / "monster_client.py"
+
+pytestmark = pytest.mark.skipif(
+    not (DEV_PATH.exists() and CLIENT_PATH.exists()),
+    reason="/dev/monster or monster_client.py missing; load the module first",
+)
+
+
+class PersistentClient:
+    """One monster_client.py process, fed commands on stdin and shared by every test."""
+
+    def __init__(self, args):
+        # stderr goes to a file: nobody reads it until teardown, and a pipe could fill up
+        # and stall the client for the rest of the session
+        self._stderr = tempfile.TemporaryFile()
+        # posix_spawn needs close_fds=False and no cwd/preexec_fn/pass_fds/session options;
+        # descriptors are non-inheritable by default (PEP 446), so only the pipes reach the child
+        self.proc = subprocess.Popen(
             args,
-            check=True,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=self._stderr,
+            close_fds=False,
         )
-    except subprocess.CalledProcessError as exc:
-        stderr = exc.stderr or ""
-        if "failed to open" in stderr or "No such file" in stderr:
-            pytest.skip(f"monster device unavailable: {stderr.strip()}")
-        raise
-    return completed.stdout
+        self._pending = b""
+
+    def run(self, *commands, timeout=TIMEOUT):
+        """Send `commands` and return the raw bytes the client printed in response.
+
+        Returns None if the client exits before answering.
+        """
+        payload = "".join(f"{cmd}\n" for cmd in commands + (FRAME_COMMAND,))
+        try:
+            self.proc.stdin.write(payload.encode())
+            self.proc.stdin.flush()
+        except BrokenPipeError:
+            # the client already exited; nothing will answer
+            return None
+        return self.read_frame(timeout)
 
+    def read_frame(self, timeout=TIMEOUT):
+        """Return output up to the next frame marker reply, or None if the client exits."""
+        fd = self.proc.stdout.fileno()
+        deadline = time.monotonic() + timeout
+        buf = self._pending
+        while True:
+            idx = buf.find(FRAME_REPLY)
+            if idx >= 0 and buf.find(b"\n", idx) >= 0:
+                start = buf.rfind(b"\n", 0, idx) + 1
+                self._pending = buf[buf.find(b"\n", idx) + 1:]
+                return buf[:start]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"no reply from monster within {timeout}s: {buf!r}")
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                return None
+            buf += chunk
+
+    def stderr(self):
+        """Everything the client has written to stderr so far."""
+        self._stderr.seek(0)
+        return self._stderr.read()
+
+    def close(self, timeout=TIMEOUT):
+        # plain mode treats "quit" as the end of the session
+        try:
+            self.proc.communicate(b"quit\n", timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.communicate()
+            raise
+        finally:
+            self._stderr.close()
+
+
+# Each open of /dev/monster gets its own session and the module serialises world state
+# under world_lock, so this needs no xdist group or file lock: under `pytest -n N` every
+# worker starts its own client, and the others' broadcasts only add lines to its frames.
+@pytest.fixture(scope="session")
+def monster():
+    if not getattr(subprocess, "_USE_POSIX_SPAWN", False):
+        warnings.warn("subprocess can't use posix_spawn here; the client starts via fork/exec")
+    client = PersistentClient([
+        sys.executable,
+        str(CLIENT_PATH),
+        "--dev",
+        str(DEV_PATH),
+        "--cmds",
+        "\x1f".join(["login tester", FRAME_COMMAND]),
+        "--plain",
+        "--no-echo-prompt",
+    ])
+    client.login_output = client.read_frame()
+    if client.login_output is None:
+        returncode = client.proc.wait()
+        stderr = client.stderr()
+        if b"failed to open" in stderr or b"No such file" in stderr:
+            reason = stderr.decode("utf-8", "replace").strip()
+            pytest.skip(f"monster device unavailable: {reason}")
+        pytest.fail(
+            f"monster_client.py exited with {returncode}: "
+            f"{stderr.decode('utf-8', 'replace').strip()}"
+        )
+    yield client
+    client.close()
 
-def test_login_and_look_produces_room_description():
-    output = run_client("login tester", "look", "quit")
 
-    assert "[PROC] Helper thread tester spawned." in output
-    assert "== /proc/nursery ==" in output
+SCENARIOS = [
+    # an empty batch checks what the fixture's auto-login printed
+    pytest.param((), [b"[PROC] Helper thread tester spawned."], id="login"),
+    pytest.param(("look",), [b"== /proc/nursery =="], id="look"),
+    pytest.param(("state",), [b"[STATE] stability=", b"Monster:"], id="state"),
+]
 
 
-def test_state_command_reports_status():
-    output = run_client("login status", "state", "quit")
+@pytest.mark.parametrize("commands,checks", SCENARIOS)
+def test_device_scenario(monster, commands, checks):
+    output = monster.run(*commands) if commands else monster.login_output
+    assert output is not None, "monster_client.py exited mid-session"
 
-    assert "[STATE] stability=" in output
-    assert "Monster:" in output
+    for expected in checks:
+        assert expected in output